@@ -4,13 +4,22 @@ Command-line interface for shorts-whisperer
 
 import os
 import sys
+import asyncio
+import threading
 import click
 from pathlib import Path
 import json
 import logging
 
 from shorts_whisperer.transcriber import transcribe_video, Transcript, Segment
-from shorts_whisperer.generator import generate_title_description
+from shorts_whisperer.generator import (
+    generate_title_description,
+    agenerate_title_description,
+    generate_titles_batch,
+    aclose_client,
+    preload_model,
+    run_context_size
+)
 
 
 # Configure logging
@@ -18,26 +27,66 @@ logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger('shorts-whisperer')
 
 
+def _prefetch(path: Path) -> None:
+    """Ask the kernel to start reading a file into the page cache in the background."""
+    if not hasattr(os, "posix_fadvise"):
+        # Not available on macOS or Windows
+        return
+
+    try:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+    except OSError as e:
+        logger.debug(f"Could not prefetch {path}: {str(e)}")
+
+
+async def _generate_all(video_paths, video_transcripts, model, custom_prompt, full_transcript, use_cache, num_ctx):
+    """Run title and description generation for several clips concurrently over one Ollama client."""
+    import ollama
+
+    client = ollama.AsyncClient()
+    try:
+        return await asyncio.gather(*(
+            agenerate_title_description(
+                video_transcript,
+                model,
+                custom_prompt,
+                filename=video_path.name,
+                full_transcript=full_transcript,
+                use_cache=use_cache,
+                num_ctx=num_ctx,
+                client=client
+            )
+            for video_path, video_transcript in zip(video_paths, video_transcripts)
+        ))
+    finally:
+        await aclose_client(client)
+
+
 @click.command()
 @click.option(
     "--input",
     "-i",
     required=True,
-    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True),
-    help="Path to the input video file",
+    multiple=True,
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True, path_type=Path),
+    help="Path to the input video file (can be given multiple times)",
 )
 @click.option(
     "--full-transcript",
     "-f",
     required=False,
-    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True),
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True, path_type=Path),
     help="Path to the full episode transcript JSON for reference",
 )
 @click.option(
     "--output",
     "-o",
     required=False,
-    type=click.Path(file_okay=True, dir_okay=False, writable=True),
+    type=click.Path(file_okay=True, dir_okay=False, writable=True, path_type=Path),
     help="Path to save the generated title and description",
 )
 @click.option(
@@ -49,7 +98,7 @@ logger = logging.getLogger('shorts-whisperer')
 @click.option(
     "--prompt-template",
     "-p",
-    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True),
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True, path_type=Path),
     help="Path to a custom prompt template file",
 )
 @click.option(
@@ -62,16 +111,39 @@ logger = logging.getLogger('shorts-whisperer')
 @click.option(
     "--load-transcript",
     "-l",
-    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True),
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True, path_type=Path),
     help="Path to load an existing transcript instead of generating one",
 )
 @click.option(
     "--whisper-model",
     "-w",
     default="medium.en",
-    type=click.Choice(["tiny", "base", "small", "medium", "large", "tiny.en", "base.en", "small.en", "medium.en", "large.en"]),
+    type=click.Choice(["tiny", "base", "small", "medium", "large", "large-v3", "turbo", "tiny.en", "base.en", "small.en", "medium.en"]),
     help="Whisper model to use for transcription",
 )
+@click.option(
+    "--compute-type",
+    "-c",
+    default="int8",
+    type=click.Choice(["int8", "int8_float16", "int8_float32", "float16", "float32", "default"]),
+    help="Compute type for the Whisper model (int8 is fastest on CPU)",
+)
+@click.option(
+    "--language",
+    default=None,
+    help="Language code of the video (e.g. en); skips language detection",
+)
+@click.option(
+    "--batch",
+    "-b",
+    is_flag=True,
+    help="With multiple inputs, generate all titles and descriptions in a single Ollama request",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Generate new titles and descriptions instead of reusing cached Ollama responses",
+)
 @click.option(
     "--verbose",
     "-v",
@@ -84,7 +156,7 @@ logger = logging.getLogger('shorts-whisperer')
     is_flag=True,
     help="Show quality assessment and improvement suggestions",
 )
-def main(input, full_transcript, output, model, prompt_template, transcript_format, load_transcript, whisper_model, verbose, show_quality):
+def main(input, full_transcript, output, model, prompt_template, transcript_format, load_transcript, whisper_model, compute_type, language, batch, no_cache, verbose, show_quality):
     """
     Transcribe a video and generate a title and description based on the transcription.
     """
@@ -92,41 +164,31 @@ def main(input, full_transcript, output, model, prompt_template, transcript_form
     if not verbose:
         logger.setLevel(logging.WARNING)
         # Suppress other loggers
-        logging.getLogger("moviepy").setLevel(logging.ERROR)
-        logging.getLogger("whisper").setLevel(logging.ERROR)
+        logging.getLogger("faster_whisper").setLevel(logging.ERROR)
         logging.getLogger("ollama").setLevel(logging.ERROR)
 
-    logger.info(f"Processing video: {input}")
+    if load_transcript and len(input) > 1:
+        raise click.UsageError("--load-transcript can only be used with a single --input")
+    if batch and prompt_template and len(input) > 1:
+        raise click.UsageError("--batch cannot be combined with --prompt-template")
+
+    # Start reading the input files into the page cache before they are needed.
+    # The videos are skipped when an existing transcript is loaded instead.
+    for path in ([load_transcript] if load_transcript else list(input)) + [full_transcript]:
+        if path:
+            _prefetch(path)
 
     # Variables to hold both transcripts
-    video_transcript = None
+    video_transcripts = []
     full_episode_transcript = None
 
-    # Either load an existing transcript or generate a new one
-    if load_transcript:
-        logger.info(f"Loading video transcript from: {load_transcript}")
-        transcript_path = Path(load_transcript)
-        if transcript_format == "json":
-            video_transcript = Transcript.from_json(transcript_path)
-        else:
-            # For future implementation of other formats
-            logger.warning(f"Format {transcript_format} not yet supported for loading. Using JSON format.")
-            video_transcript = Transcript.from_json(transcript_path)
-    else:
-        # Generate transcript from the video
-        logger.info("Generating transcript from video...")
-        video_transcript = transcribe_video(input, model_name=whisper_model)
-        logger.info("Transcript generation complete.")
-
     # Load the full episode transcript if provided
     if full_transcript:
-        full_transcript_path = Path(full_transcript)
-        logger.info(f"Loading full episode transcript from: {full_transcript_path}")
+        logger.info(f"Loading full episode transcript from: {full_transcript}")
 
         # Load the full transcript as plain text
         try:
-            with open(full_transcript_path, 'r', encoding='utf-8') as f:
-                full_text = f.read()
+            full_text = full_transcript.read_text(encoding='utf-8')
 
             # Create a simple transcript with the full text
             full_episode_transcript = Transcript()
@@ -140,29 +202,98 @@ def main(input, full_transcript, output, model, prompt_template, transcript_form
     # Load custom prompt template if provided
     custom_prompt = None
     if prompt_template:
-        with open(prompt_template, 'r', encoding='utf-8') as f:
-            custom_prompt = f.read()
+        custom_prompt = prompt_template.read_text(encoding='utf-8')
         logger.info(f"Using custom prompt template from: {prompt_template}")
 
+    # Ollama reloads the model when num_ctx changes, so every request in the run
+    # uses the same size, picked for the largest prompt
+    batch = batch and len(input) > 1
+    num_ctx = run_context_size(model, full_episode_transcript, custom_prompt=custom_prompt, batch=batch)
+
+    # Load the Ollama model in the background while the video is transcribed
+    threading.Thread(target=preload_model, args=(model,), kwargs={"num_ctx": num_ctx}, daemon=True).start()
+
+    for video_path in input:
+        logger.info(f"Processing video: {video_path}")
+
+        # Either load an existing transcript or generate a new one
+        if load_transcript:
+            logger.info(f"Loading video transcript from: {load_transcript}")
+            if transcript_format == "json":
+                video_transcript = Transcript.from_json(load_transcript)
+            else:
+                # For future implementation of other formats
+                logger.warning(f"Format {transcript_format} not yet supported for loading. Using JSON format.")
+                video_transcript = Transcript.from_json(load_transcript)
+        else:
+            # Generate transcript from the video
+            logger.info("Generating transcript from video...")
+            video_transcript = transcribe_video(
+                video_path,
+                model_name=whisper_model,
+                compute_type=compute_type,
+                language=language
+            )
+            logger.info("Transcript generation complete.")
+
+        video_transcripts.append(video_transcript)
+
+    # The clip prompts are only known now. This only grows num_ctx (and makes
+    # Ollama reload the preloaded model once) for clips too long for it.
+    num_ctx = max(num_ctx, run_context_size(
+        model, full_episode_transcript, video_transcripts, custom_prompt=custom_prompt, batch=batch
+    ))
+
     # Generate title and description
     logger.info(f"Generating title and description using model: {model}")
-    title, description = generate_title_description(
-        video_transcript,
-        model,
-        custom_prompt,
-        filename=os.path.basename(input),
-        full_transcript=full_episode_transcript
-    )
+    if len(input) == 1:
+        # Single clip: keep the plain synchronous path
+        results = [generate_title_description(
+            video_transcripts[0],
+            model,
+            custom_prompt,
+            filename=input[0].name,
+            full_transcript=full_episode_transcript,
+            use_cache=not no_cache,
+            num_ctx=num_ctx
+        )]
+    elif batch:
+        # Multiple clips in a single request
+        results = generate_titles_batch(
+            video_transcripts,
+            model,
+            full_transcript=full_episode_transcript,
+            use_cache=not no_cache,
+            num_ctx=num_ctx
+        )
+    else:
+        # Multiple clips: send all requests concurrently. Ollama is only checked
+        # for clips that don't have a cached response.
+        results = asyncio.run(_generate_all(
+            input,
+            video_transcripts,
+            model,
+            custom_prompt,
+            full_episode_transcript,
+            use_cache=not no_cache,
+            num_ctx=num_ctx
+        ))
 
     # Output the results
-    result = f"Title: {title}\n\nDescription:\n{description}"
+    if len(input) == 1:
+        title, description = results[0]
+        result = f"Title: {title}\n\nDescription:\n{description}"
+    else:
+        result = "\n\n".join(
+            f"File: {video_path.name}\nTitle: {title}\n\nDescription:\n{description}"
+            for video_path, (title, description) in zip(input, results)
+        )
 
     if output:
-        output_path = Path(output)
         # Create the directory if it doesn't exist
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        output_path.write_text(result)
-        logger.info(f"Title and description saved to: {output_path}")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(result)
+        logger.info(f"Title and description saved to: {output}")
     else:
         # Always print the result to stdout regardless of verbose setting
         click.echo("\n" + result)
@@ -2,17 +2,228 @@
 Title and description generator using Ollama
 """
 
-import ollama
-from typing import Tuple, Optional
+from typing import Any, Dict, List, Sequence, Tuple, Optional, TYPE_CHECKING
+from pathlib import Path
+import os
 import sys
 import re
+import hashlib
 import logging
+import unicodedata
+
+import orjson
 
 from shorts_whisperer.transcriber import Transcript
 
+if TYPE_CHECKING:
+    import ollama
+
 # Get logger
 logger = logging.getLogger('shorts-whisperer')
 
+# Patterns for notes or explanations trailing the generated description
+NOTE_PATTERNS = [
+    re.compile(pattern, re.DOTALL)
+    for pattern in (
+        r'\n\s*\(Note:.*',
+        r'\n\s*\n.*',
+        r'\n\s*The description .*',
+    )
+]
+
+# A blank line ending a paragraph
+PARAGRAPH_BREAK_RE = re.compile(r'\n\s*\n')
+
+# Patterns for the "TITLE: ... DESCRIPTION: ..." response format
+TITLE_RE = re.compile(r'(?:^|\n)(?:TITLE|Title):\s*(.*?)(?:\n|$)', re.IGNORECASE)
+DESCRIPTION_RE = re.compile(r'(?:^|\n)(?:DESCRIPTION|Description):\s*(.*?)(?:\n\n|\Z)', re.IGNORECASE | re.DOTALL)
+
+# Generation options for title and description requests; the response is
+# short, so bound its length and keep the output focused
+GENERATION_OPTIONS = {"num_predict": 400, "temperature": 0.4}
+
+# Description used when none could be parsed from the response
+NO_DESCRIPTION = "No description generated."
+
+# Bounds for the context window (num_ctx) requested from Ollama
+MIN_NUM_CTX = 2048
+MAX_NUM_CTX = 32768
+
+# Default prompt for a clip transcript
+PROMPT_TEMPLATE = """Create a title and description for a video clip based on this transcript.
+
+TRANSCRIPT:
+{transcript}
+
+REQUIREMENTS:
+- Title: Summarize the main topic discussed in the clip (under 100 characters)
+- Description: Explain what is discussed in the clip (2-3 sentences)
+- Use only information that is actually mentioned in the transcript
+- Be accurate and direct
+
+FORMAT:
+# Title
+
+Description
+"""
+
+# Default prompt for a clip transcript with full episode context
+PROMPT_TEMPLATE_WITH_CONTEXT = """Create a title and description for a video clip based on this transcript.
+
+{context_label} (for context):
+{context}
+
+SHORT CLIP TRANSCRIPT (main content):
+{transcript}
+
+REQUIREMENTS:
+- Title: Summarize the main topic discussed in the clip (under 100 characters)
+- Description: Explain what is discussed in the clip (2-3 sentences)
+- Use only information that is actually mentioned in the transcript
+- Be accurate and direct
+
+FORMAT:
+# Title
+
+Description
+"""
+
+# Prompt for generating titles and descriptions for several clips in one request
+BATCH_PROMPT_TEMPLATE = """Create a title and description for each of the following video clips based on their transcripts.
+{context}
+{clips}
+REQUIREMENTS:
+- Title: Summarize the main topic discussed in the clip (under 100 characters)
+- Description: Explain what is discussed in the clip (2-3 sentences)
+- Use only information that is actually mentioned in the transcript
+- Be accurate and direct
+
+FORMAT:
+Respond with a JSON object with one entry per clip, in the same order as the clips above:
+{{"clips": [{{"title": "Title", "description": "Description"}}]}}
+"""
+
+# Prompt used to condense a full episode transcript before it is used as context.
+# The instruction comes last, so it survives if Ollama truncates a long
+# transcript from the front.
+SUMMARY_PROMPT = """TRANSCRIPT:
+{transcript}
+
+Summarize the podcast episode transcript above in about 150 words.
+Focus on the main topics, guests and key points that are discussed.
+"""
+
+# Labels for the full episode context in clip prompts
+SUMMARY_CONTEXT_LABEL = "FULL EPISODE SUMMARY"
+TRANSCRIPT_CONTEXT_LABEL = "FULL EPISODE TRANSCRIPT"
+
+
+def get_cache_dir() -> Path:
+    """
+    Get the directory used to cache generated data between runs.
+
+    Uses $SHORTS_WHISPERER_CACHE_DIR if set, otherwise
+    $XDG_CACHE_HOME/shorts-whisperer (defaulting to ~/.cache/shorts-whisperer).
+    """
+    cache_dir = os.environ.get("SHORTS_WHISPERER_CACHE_DIR")
+    if cache_dir:
+        return Path(cache_dir)
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "shorts-whisperer"
+
+
+def context_size(prompt: str, num_predict: int) -> int:
+    """
+    Pick a context window size (num_ctx) that fits the prompt and the response.
+
+    Estimates about 4 characters per token and rounds up to a power of two,
+    so long prompts aren't silently truncated and short ones don't allocate
+    an oversized KV cache.
+
+    Args:
+        prompt: The prompt to send
+        num_predict: The maximum number of tokens to generate
+
+    Returns:
+        The number of tokens to request, between MIN_NUM_CTX and MAX_NUM_CTX
+    """
+    return _context_size(len(prompt), num_predict)
+
+
+def _context_size(prompt_length: int, num_predict: int) -> int:
+    """Pick a context window size for a prompt of prompt_length characters."""
+    needed = prompt_length // 4 + num_predict
+    return max(MIN_NUM_CTX, min(MAX_NUM_CTX, 1 << (needed - 1).bit_length()))
+
+
+def run_context_size(
+    model: str,
+    full_transcript: Optional[Transcript] = None,
+    transcripts: Sequence[Transcript] = (),
+    custom_prompt: Optional[str] = None,
+    batch: bool = False
+) -> int:
+    """
+    Pick one context window size (num_ctx) for all of a run's Ollama requests.
+
+    Ollama reloads the model whenever num_ctx changes, so the preload, the
+    episode summary and the clip requests all use the size of the largest
+    prompt in the run. Clip prompts are estimated with room for an episode
+    summary of up to num_predict tokens when it isn't cached yet.
+
+    Args:
+        model: The Ollama model to use
+        full_transcript: Optional full episode transcript for context
+        transcripts: The clip transcripts, if they are known yet
+        custom_prompt: Optional custom prompt template
+        batch: Whether the clips are sent in a single batch request
+
+    Returns:
+        The number of tokens to request, between MIN_NUM_CTX and MAX_NUM_CTX
+    """
+    num_predict = GENERATION_OPTIONS["num_predict"]
+    sizes = [MIN_NUM_CTX]
+
+    # Custom prompts have no episode context, except in batch requests
+    uses_context = full_transcript is not None and (batch or not custom_prompt)
+    context_length = 0
+    if uses_context:
+        summary = _read_cached_summary(full_transcript, model)
+        if summary is None:
+            sizes.append(context_size(SUMMARY_PROMPT.format(transcript=full_transcript.full_text), num_predict))
+            context_length = num_predict * 4
+        else:
+            context_length = len(summary)
+
+    if batch:
+        length = len(BATCH_PROMPT_TEMPLATE) + context_length + sum(len(t.full_text) + 16 for t in transcripts)
+        sizes.append(_context_size(length, num_predict * len(transcripts)))
+    else:
+        template = custom_prompt or (PROMPT_TEMPLATE_WITH_CONTEXT if uses_context else PROMPT_TEMPLATE)
+        sizes.extend(
+            _context_size(len(template) + context_length + len(t.full_text), num_predict)
+            for t in transcripts
+        )
+
+    return max(sizes)
+
+
+def _generation_options(
+    prompt: str,
+    num_predict: int = GENERATION_OPTIONS["num_predict"],
+    num_ctx: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Build the Ollama options for a request.
+
+    The request gets the run's num_ctx if given, so Ollama doesn't reload the
+    model between requests, and is only made larger if its prompt needs it.
+    """
+    return {
+        **GENERATION_OPTIONS,
+        "num_predict": num_predict,
+        "num_ctx": max(num_ctx or MIN_NUM_CTX, context_size(prompt, num_predict)),
+    }
+
 
 def check_ollama_availability(model: str) -> bool:
     """
@@ -24,29 +235,28 @@ def check_ollama_availability(model: str) -> bool:
     Returns:
         True if Ollama is available and model exists, False otherwise
     """
+    # Imported lazily to keep CLI startup fast
+    import ollama
+
     try:
-        # Try to list models to see if Ollama is running
-        models = ollama.list()
-
-        # Check if the specific model is available
-        # Handle both old dict format and new object format
-        if hasattr(models, 'models'):
-            # New format: models is an object with .models attribute
-            model_names = [m.model for m in models.models]
-        else:
-            # Old format: models is a dict with 'models' key
-            model_names = [m['name'] for m in models.get('models', [])]
+        # Looking up the model fails if Ollama is down or the model is missing
+        ollama.show(model)
 
-        # Handle both exact matches and base model names
-        model_base = model.split(':')[0]  # Remove tag if present
-        available = any(model in name or model_base in name for name in model_names)
+        logger.info(f"Ollama is running and model '{model}' is available")
+        return True
 
-        if not available:
-            logger.error(f"Model '{model}' not found. Available models: {', '.join(model_names)}")
+    except ollama.ResponseError as e:
+        if e.status_code != 404:
+            logger.error(f"Failed to check model '{model}': {e.error}")
             return False
 
-        logger.info(f"Ollama is running and model '{model}' is available")
-        return True
+        # Only list the installed models when we need them for the error message
+        try:
+            model_names = [m.model for m in ollama.list().models]
+        except Exception:
+            model_names = []
+        logger.error(f"Model '{model}' not found. Available models: {', '.join(model_names)}")
+        return False
 
     except ConnectionError:
         logger.error("Ollama is not running. Please start Ollama first.")
@@ -56,6 +266,126 @@ def check_ollama_availability(model: str) -> bool:
         return False
 
 
+def preload_model(model: str, keep_alive: str = "30m", num_ctx: int = MIN_NUM_CTX) -> None:
+    """
+    Load the model into Ollama's memory ahead of the first chat request.
+
+    Intended to run in a background thread while the video is being
+    transcribed. Failures are only logged, since availability is checked
+    again before generating.
+
+    Args:
+        model: The model name to load
+        keep_alive: How long Ollama should keep the model loaded
+        num_ctx: The context window size the run's requests will use
+    """
+    import ollama
+
+    try:
+        # An empty prompt loads the model without generating anything. Ollama
+        # reloads the model when num_ctx changes, so load it with the size
+        # the run's requests will use.
+        ollama.generate(
+            model=model,
+            prompt="",
+            keep_alive=keep_alive,
+            options={"num_ctx": num_ctx}
+        )
+        logger.info(f"Preloaded Ollama model '{model}'")
+    except Exception as e:
+        logger.info(f"Could not preload Ollama model '{model}': {str(e)}")
+
+
+def _summary_cache_path(full_transcript: Transcript, model: str) -> Path:
+    """Get the cache file for the summary of a full episode transcript."""
+    key = hashlib.sha256(f"{model}\0{full_transcript.full_text}".encode("utf-8")).hexdigest()
+    return get_cache_dir() / f"{key}.summary.txt"
+
+
+def _read_cached_summary(full_transcript: Transcript, model: str) -> Optional[str]:
+    """Read the cached summary of a full episode transcript, or return None if there isn't one."""
+    try:
+        return _summary_cache_path(full_transcript, model).read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
+
+
+def summarize_full_transcript(full_transcript: Transcript, model: str, num_ctx: Optional[int] = None) -> str:
+    """
+    Summarize a full episode transcript, caching the summary on disk.
+
+    The cache is keyed by the model and the transcript text, so generating
+    titles for several shorts from the same episode only summarizes it once.
+
+    Args:
+        full_transcript: The full episode transcript
+        model: The Ollama model to summarize with
+        num_ctx: Optional context window size shared by the run's requests
+
+    Returns:
+        The summary text
+    """
+    cache_path = _summary_cache_path(full_transcript, model)
+    summary = _read_cached_summary(full_transcript, model)
+    if summary is not None:
+        logger.info(f"Using cached episode summary: {cache_path}")
+        return summary
+
+    import ollama
+
+    logger.info("Summarizing full episode transcript...")
+    prompt = SUMMARY_PROMPT.format(transcript=full_transcript.full_text)
+    response = ollama.generate(model=model, prompt=prompt, options=_generation_options(prompt, num_ctx=num_ctx))
+    summary = response["response"].strip()
+
+    # Don't keep an empty summary for good
+    if summary:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            cache_path.write_text(summary, encoding="utf-8")
+        except OSError as e:
+            logger.warning(f"Could not cache episode summary: {str(e)}")
+
+    return summary
+
+
+def _response_cache_path(model: str, messages: List[Dict[str, str]]) -> Path:
+    """
+    Get the cache file for an Ollama chat response.
+
+    The key is a SHA-256 of the model and the messages, normalized (NFC,
+    stripped, sorted keys) so that insignificant differences in the
+    prompt still hit the same entry.
+    """
+    normalized = [
+        {key: unicodedata.normalize("NFC", value).strip() for key, value in message.items()}
+        for message in messages
+    ]
+    payload = orjson.dumps(normalized, option=orjson.OPT_SORT_KEYS)
+    key = hashlib.sha256(model.encode("utf-8") + b"\0" + payload).hexdigest()
+    return get_cache_dir() / f"{key}.response.txt"
+
+
+def _read_cached_response(cache_path: Path) -> Optional[str]:
+    """Read a cached Ollama response, or return None if there isn't one."""
+    try:
+        content = cache_path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return None
+
+    logger.info(f"Using cached Ollama response: {cache_path}")
+    return content
+
+
+def _cache_response(cache_path: Path, content: str) -> None:
+    """Store an Ollama response so identical requests can reuse it."""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(content, encoding="utf-8")
+    except OSError as e:
+        logger.warning(f"Could not cache Ollama response: {str(e)}")
+
+
 def validate_output_format(title: str, description: str) -> Tuple[str, str, list]:
     """
     Basic validation to ensure output meets minimum quality standards.
@@ -80,12 +410,252 @@ def validate_output_format(title: str, description: str) -> Tuple[str, str, list
     return title, description, issues
 
 
+def _episode_context(full_transcript: Transcript, model: str, num_ctx: Optional[int] = None) -> Tuple[str, str]:
+    """
+    Get the context for a full episode, preferring its (cached) summary.
+
+    Returns:
+        A tuple of (label, text), labelled as a summary or as the full transcript
+    """
+    # A summary of the full episode keeps the prompt short
+    try:
+        summary = summarize_full_transcript(full_transcript, model, num_ctx)
+    except Exception as e:
+        logger.warning(f"Could not summarize full transcript, using it as is: {str(e)}")
+    else:
+        if summary:
+            return SUMMARY_CONTEXT_LABEL, summary
+        logger.warning("The full transcript summary is empty, using the transcript as is")
+
+    return TRANSCRIPT_CONTEXT_LABEL, full_transcript.full_text
+
+
+def _build_prompt(
+    transcript: Transcript,
+    model: str,
+    custom_prompt: Optional[str] = None,
+    full_transcript: Optional[Transcript] = None,
+    num_ctx: Optional[int] = None
+) -> str:
+    """Build the prompt sent to Ollama for a clip transcript."""
+    if custom_prompt:
+        # Use the custom prompt, replacing {transcript} with the actual transcript
+        return custom_prompt.replace("{transcript}", transcript.full_text)
+
+    # Use the enhanced default prompt
+    if full_transcript and full_transcript != transcript:
+        # If we have both transcripts and they're different, use both
+        context_label, context = _episode_context(full_transcript, model, num_ctx)
+        return PROMPT_TEMPLATE_WITH_CONTEXT.format(
+            context_label=context_label,
+            context=context,
+            transcript=transcript.full_text
+        )
+
+    # If we only have one transcript, use it
+    return PROMPT_TEMPLATE.format(transcript=transcript.full_text)
+
+
+def _require_ollama(model: str) -> None:
+    """Exit if Ollama or the model is not available."""
+    if not check_ollama_availability(model):
+        logger.error("Cannot proceed without Ollama. Exiting.")
+        sys.exit(1)
+
+
+def _lookup_request(model: str, prompt: str, use_cache: bool) -> Tuple[List[Dict[str, str]], Path, Optional[str]]:
+    """
+    Build the chat messages for a prompt and look up a cached response to them.
+
+    Returns:
+        A tuple of (messages, cache_path, cached_content), where cached_content
+        is None when there is no cached response or use_cache is False
+    """
+    messages = [
+        {
+            "role": "user",
+            "content": prompt
+        }
+    ]
+    cache_path = _response_cache_path(model, messages)
+    cached_content = _read_cached_response(cache_path) if use_cache else None
+    return messages, cache_path, cached_content
+
+
+def _prepare_request(
+    transcript: Transcript,
+    model: str,
+    custom_prompt: Optional[str],
+    filename: Optional[str],
+    full_transcript: Optional[Transcript],
+    validate: bool,
+    use_cache: bool,
+    num_ctx: Optional[int] = None
+) -> Tuple[List[Dict[str, str]], Path, Optional[str]]:
+    """Build the request for a clip, look up a cached response and otherwise check Ollama (if requested)."""
+    # Print the filename if provided
+    if filename:
+        logger.info(f"Processing file: {filename}")
+
+    prompt = _build_prompt(transcript, model, custom_prompt, full_transcript, num_ctx)
+    messages, cache_path, cached_content = _lookup_request(model, prompt, use_cache)
+
+    # A cached response doesn't need Ollama, otherwise check it is available before proceeding
+    if cached_content is None and validate:
+        _require_ollama(model)
+
+    return messages, cache_path, cached_content
+
+
+def _exit_on_error(e: Exception) -> None:
+    """Log a failed Ollama call and exit."""
+    logger.error(f"Error calling Ollama: {str(e)}")
+    logger.error("Failed to generate title and description. Exiting.")
+    sys.exit(1)
+
+
+def _response_complete(content: str) -> bool:
+    """
+    Check whether a partial markdown response already holds a full title and description.
+
+    Mirrors the markdown branch of _parse_response: everything after the blank
+    line that ends the description is dropped by clean_description, so
+    generation can stop once that blank line has been produced.
+    """
+    parts = content.split("# ", 1)
+    if len(parts) < 2:
+        return False
+
+    title_parts = parts[1].lstrip().split("\n\n", 1)
+    return len(title_parts) > 1 and PARAGRAPH_BREAK_RE.search(title_parts[1].lstrip()) is not None
+
+
+def _append_chunk(content: str, chunk: Dict[str, Any]) -> Tuple[str, bool]:
+    """
+    Add a streamed chunk to the response so far.
+
+    Returns the new content and whether generation can stop, because the
+    rest of the response would be discarded anyway.
+    """
+    content += chunk["message"]["content"]
+    return content, _response_complete(content)
+
+
+def _finish_response(content: str, cache_path: Path) -> Tuple[str, str]:
+    """Parse a complete response and, if it holds a title and description, cache it for identical requests."""
+    logger.info("Received response from Ollama")
+
+    title, description = _parse_response(content)
+    # Don't replay an empty or unparseable response on later runs
+    if title and description != NO_DESCRIPTION:
+        _cache_response(cache_path, content)
+    return title, description
+
+
+def _parse_response(content: str) -> Tuple[str, str]:
+    """Parse and validate the title and description from an Ollama response."""
+    # Parse the response - simple split by markdown header
+    parts = content.split("# ", 1)
+
+    if len(parts) > 1:
+        # Found markdown format
+        title_and_rest = parts[1].strip()
+        title_parts = title_and_rest.split("\n\n", 1)
+
+        if len(title_parts) > 1:
+            title = title_parts[0].strip()
+            description = title_parts[1].strip()
+            # Clean up description
+            description = clean_description(description)
+        else:
+            # Try with single newline
+            title_parts = title_and_rest.split("\n", 1)
+            if len(title_parts) > 1:
+                title = title_parts[0].strip()
+                description = title_parts[1].strip()
+                # Clean up description
+                description = clean_description(description)
+            else:
+                title = title_and_rest
+                description = NO_DESCRIPTION
+    else:
+        # Fallback to old format parsing
+        title_match = TITLE_RE.search(content)
+        desc_match = DESCRIPTION_RE.search(content)
+
+        if title_match:
+            title = title_match.group(1).strip()
+            if desc_match:
+                description = desc_match.group(1).strip()
+                # Clean up description
+                description = clean_description(description)
+            else:
+                description = NO_DESCRIPTION
+        else:
+            # Last resort: split by newlines
+            lines = content.strip().split("\n")
+            if len(lines) > 1:
+                title = lines[0].strip()
+                description = "\n".join(lines[1:]).strip()
+                # Clean up description
+                description = clean_description(description)
+            else:
+                title = content.strip()
+                description = NO_DESCRIPTION
+
+    return _finalize_output(title, description)
+
+
+def _finalize_output(title: str, description: str) -> Tuple[str, str]:
+    """Validate a generated title and description and log the result."""
+    # Basic validation
+    title, description, issues = validate_output_format(title, description)
+
+    if issues:
+        logger.warning("Output issues found:")
+        for issue in issues:
+            logger.warning(f"  - {issue}")
+
+    # Final output
+    logger.info(f"Final title: {title}")
+    logger.info(f"Final description: {description[:100]}{'...' if len(description) > 100 else ''}")
+
+    return title, description
+
+
+def _parse_batch_response(content: str, count: int) -> List[Tuple[str, str]]:
+    """
+    Parse the (title, description) pairs from a batch JSON response.
+
+    Raises:
+        ValueError: If the response isn't valid JSON, doesn't hold exactly
+            count clips, or a clip lacks a title or description
+    """
+    data = orjson.loads(content)
+    items = data.get("clips") if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        raise ValueError("expected a list of clips")
+    if len(items) != count:
+        raise ValueError(f"expected {count} clips, got {len(items)}")
+
+    pairs = []
+    for number, item in enumerate(items, start=1):
+        if not isinstance(item, dict) or not all(isinstance(item.get(key), str) for key in ("title", "description")):
+            raise ValueError(f"clip {number} has no title or description")
+        pairs.append((item["title"], item["description"]))
+
+    return pairs
+
+
 def generate_title_description(
     transcript: Transcript,
     model: str = "llama3.2:latest",
     custom_prompt: Optional[str] = None,
     filename: Optional[str] = None,
-    full_transcript: Optional[Transcript] = None
+    full_transcript: Optional[Transcript] = None,
+    validate: bool = True,
+    use_cache: bool = True,
+    num_ctx: Optional[int] = None
 ) -> Tuple[str, str]:
     """
     Generate a title and description based on a transcript using Ollama.
@@ -96,169 +666,214 @@ def generate_title_description(
         custom_prompt: Optional custom prompt template
         filename: Optional filename for display purposes
         full_transcript: Optional full episode transcript for context
+        validate: Check that Ollama and the model are available first
+        use_cache: Reuse a cached response for an identical prompt
+        num_ctx: Optional context window size shared by the run's requests
 
     Returns:
         A tuple of (title, description)
     """
-    # Print the filename if provided
-    if filename:
-        logger.info(f"Processing file: {filename}")
+    # Prepare the request, reusing the response to an identical earlier one
+    messages, cache_path, content = _prepare_request(
+        transcript, model, custom_prompt, filename, full_transcript, validate, use_cache, num_ctx
+    )
+    if content is not None:
+        return _parse_response(content)
 
-    # Check if Ollama is available before proceeding
-    if not check_ollama_availability(model):
-        logger.error("Cannot proceed without Ollama. Exiting.")
-        sys.exit(1)
+    import ollama
 
-    # Calculate transcript metrics for better context
-    word_count = len(transcript.full_text.split())
-    duration = max(segment.end for segment in transcript.segments) if transcript.segments else 0
+    # Call Ollama
+    try:
+        logger.info(f"Using Ollama model: {model}")
+        logger.info("Sending prompt to Ollama...")
 
-    # Prepare the prompt
-    if custom_prompt:
-        # Use the custom prompt, replacing {transcript} with the actual transcript
-        prompt = custom_prompt.replace("{transcript}", transcript.full_text)
-    else:
-        # Use the enhanced default prompt
-        if full_transcript and full_transcript != transcript:
-            # If we have both transcripts and they're different, use both
-            prompt = f"""
-                                    Create a title and description for a video clip based on this transcript.
+        stream = ollama.chat(
+            model=model,
+            messages=messages,
+            stream=True,
+            options=_generation_options(messages[0]["content"], num_ctx=num_ctx)
+        )
 
-            FULL EPISODE TRANSCRIPT (for context):
-            {full_transcript.full_text}
+        content = ""
+        for chunk in stream:
+            content, done = _append_chunk(content, chunk)
+            if done:
+                stream.close()
+                break
 
-            SHORT CLIP TRANSCRIPT (main content):
-            {transcript.full_text}
+        return _finish_response(content, cache_path)
 
-            REQUIREMENTS:
-            - Title: Summarize the main topic discussed in the clip (under 100 characters)
-            - Description: Explain what is discussed in the clip (2-3 sentences)
-            - Use only information that is actually mentioned in the transcript
-            - Be accurate and direct
+    except Exception as e:
+        _exit_on_error(e)
 
-            FORMAT:
-            # Title
 
-            Description
-            """
-        else:
-                        # If we only have one transcript, use it
-            prompt = f"""
-            Create a title and description for a video clip based on this transcript.
+async def agenerate_title_description(
+    transcript: Transcript,
+    model: str = "llama3.2:latest",
+    custom_prompt: Optional[str] = None,
+    filename: Optional[str] = None,
+    full_transcript: Optional[Transcript] = None,
+    validate: bool = True,
+    use_cache: bool = True,
+    num_ctx: Optional[int] = None,
+    client: Optional["ollama.AsyncClient"] = None
+) -> Tuple[str, str]:
+    """
+    Asynchronous variant of generate_title_description using ollama.AsyncClient.
 
-            TRANSCRIPT:
-            {transcript.full_text}
+    Running several of these with asyncio.gather lets the Ollama server work
+    on multiple clips at once (up to its OLLAMA_NUM_PARALLEL setting). Pass
+    them one shared client; without one, a client is opened and closed just
+    for this request.
 
-            REQUIREMENTS:
-            - Title: Summarize the main topic discussed in the clip (under 100 characters)
-            - Description: Explain what is discussed in the clip (2-3 sentences)
-            - Use only information that is actually mentioned in the transcript
-            - Be accurate and direct
+    Args:
+        transcript: The transcript from the video clip to generate from
+        model: The Ollama model to use
+        custom_prompt: Optional custom prompt template
+        filename: Optional filename for display purposes
+        full_transcript: Optional full episode transcript for context
+        validate: Check that Ollama and the model are available first
+        use_cache: Reuse a cached response for an identical prompt
+        num_ctx: Optional context window size shared by the run's requests
+        client: Optional Ollama client to send the request with
+
+    Returns:
+        A tuple of (title, description)
+    """
+    # Prepare the request, reusing the response to an identical earlier one. The
+    # episode summary is built synchronously, so clips from the same episode
+    # running concurrently share a single cached summary.
+    messages, cache_path, content = _prepare_request(
+        transcript, model, custom_prompt, filename, full_transcript, validate, use_cache, num_ctx
+    )
+    if content is not None:
+        return _parse_response(content)
 
-            FORMAT:
-            # Title
+    import ollama
 
-            Description
-            """
+    own_client = client is None
+    if own_client:
+        client = ollama.AsyncClient()
 
     # Call Ollama
     try:
         logger.info(f"Using Ollama model: {model}")
         logger.info("Sending prompt to Ollama...")
 
-        response = ollama.chat(
+        stream = await client.chat(
             model=model,
-            messages=[
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ]
+            messages=messages,
+            stream=True,
+            options=_generation_options(messages[0]["content"], num_ctx=num_ctx)
         )
 
-        logger.info("Received response from Ollama")
+        content = ""
+        async for chunk in stream:
+            content, done = _append_chunk(content, chunk)
+            if done:
+                await stream.aclose()
+                break
 
-        # Extract the response content
-        content = response["message"]["content"]
+        return _finish_response(content, cache_path)
 
-        # Parse the response - simple split by markdown header
-        parts = content.split("# ", 1)
+    except Exception as e:
+        _exit_on_error(e)
 
-        if len(parts) > 1:
-            # Found markdown format
-            title_and_rest = parts[1].strip()
-            title_parts = title_and_rest.split("\n\n", 1)
+    finally:
+        if own_client:
+            await aclose_client(client)
 
-            if len(title_parts) > 1:
-                title = title_parts[0].strip()
-                description = title_parts[1].strip()
-                # Clean up description
-                description = clean_description(description)
-            else:
-                # Try with single newline
-                title_parts = title_and_rest.split("\n", 1)
-                if len(title_parts) > 1:
-                    title = title_parts[0].strip()
-                    description = title_parts[1].strip()
-                    # Clean up description
-                    description = clean_description(description)
-                else:
-                    title = title_and_rest
-                    description = "No description generated."
-        else:
-            # Fallback to old format parsing
-            title_match = re.search(r'(?:^|\n)(?:TITLE|Title):\s*(.*?)(?:\n|$)', content, re.IGNORECASE)
-            desc_match = re.search(r'(?:^|\n)(?:DESCRIPTION|Description):\s*(.*?)(?:\n\n|\Z)', content, re.IGNORECASE | re.DOTALL)
-
-            if title_match:
-                title = title_match.group(1).strip()
-                if desc_match:
-                    description = desc_match.group(1).strip()
-                    # Clean up description
-                    description = clean_description(description)
-                else:
-                    description = "No description generated."
-            else:
-                # Last resort: split by newlines
-                lines = content.strip().split("\n")
-                if len(lines) > 1:
-                    title = lines[0].strip()
-                    description = "\n".join(lines[1:]).strip()
-                    # Clean up description
-                    description = clean_description(description)
-                else:
-                    title = content.strip()
-                    description = "No description generated."
-
-        # Basic validation
-        title, description, issues = validate_output_format(title, description)
-
-        if issues:
-            logger.warning("Output issues found:")
-            for issue in issues:
-                logger.warning(f"  - {issue}")
-
-        # Final output
-        logger.info(f"Final title: {title}")
-        logger.info(f"Final description: {description[:100]}{'...' if len(description) > 100 else ''}")
-
-        return title, description
 
-    except Exception as e:
-        logger.error(f"Error calling Ollama: {str(e)}")
-        logger.error("Failed to generate title and description. Exiting.")
+async def aclose_client(client: "ollama.AsyncClient") -> None:
+    """Close an Ollama async client and its connections."""
+    # ollama 0.4 has no public close method, so close the underlying httpx client
+    await client._client.aclose()
+
+
+def generate_titles_batch(
+    transcripts: List[Transcript],
+    model: str = "llama3.2:latest",
+    full_transcript: Optional[Transcript] = None,
+    validate: bool = True,
+    use_cache: bool = True,
+    num_ctx: Optional[int] = None
+) -> List[Tuple[str, str]]:
+    """
+    Generate titles and descriptions for several clips with a single Ollama request.
+
+    The clips are numbered in one prompt and the model is asked for a JSON
+    object holding one title and description per clip, which saves the
+    per-request overhead when there are many short clips.
+
+    Args:
+        transcripts: The transcripts of the video clips, in order
+        model: The Ollama model to use
+        full_transcript: Optional full episode transcript for context
+        validate: Check that Ollama and the model are available first
+        use_cache: Reuse a cached response for an identical prompt
+        num_ctx: Optional context window size shared by the run's requests
+
+    Returns:
+        A list of (title, description) tuples, one per transcript
+    """
+    # Prepare the prompt
+    context = ""
+    if full_transcript:
+        context_label, context_text = _episode_context(full_transcript, model, num_ctx)
+        context = f"\n{context_label} (for context):\n{context_text}\n"
+    clips = "".join(
+        f"\n## Clip {number}\n{transcript.full_text}\n"
+        for number, transcript in enumerate(transcripts, start=1)
+    )
+    prompt = BATCH_PROMPT_TEMPLATE.format(context=context, clips=clips)
+
+    # Reuse the response to an identical earlier request, otherwise check that
+    # Ollama is available before proceeding
+    messages, cache_path, content = _lookup_request(model, prompt, use_cache)
+    if content is None and validate:
+        _require_ollama(model)
+
+    if content is None:
+        import ollama
+
+        # Call Ollama
+        try:
+            logger.info(f"Using Ollama model: {model}")
+            logger.info(f"Sending batch prompt for {len(transcripts)} clips to Ollama...")
+
+            response = ollama.chat(
+                model=model,
+                messages=messages,
+                format="json",
+                options=_generation_options(prompt, GENERATION_OPTIONS["num_predict"] * len(transcripts), num_ctx)
+            )
+            content = response["message"]["content"]
+
+            logger.info("Received response from Ollama")
+
+        except Exception as e:
+            _exit_on_error(e)
+
+    # Parse the response content
+    try:
+        items = _parse_batch_response(content, len(transcripts))
+    except ValueError as e:
+        logger.error(f"Ollama returned a malformed batch response: {str(e)}")
+        logger.error("Failed to generate titles and descriptions. Exiting.")
         sys.exit(1)
 
+    results = [
+        _finalize_output(title, clean_description(description.strip()))
+        for title, description in items
+    ]
+    _cache_response(cache_path, content)
+    return results
+
+
 def clean_description(description: str) -> str:
     """Clean up the description by removing notes and explanations."""
     # Remove any notes or explanations after the description
     # Look for patterns like "(Note:" or empty lines followed by explanations
-    note_patterns = [
-        r'\n\s*\(Note:.*',
-        r'\n\s*\n.*',
-        r'\n\s*The description .*',
-    ]
-
-    for pattern in note_patterns:
-        description = re.sub(pattern, '', description, flags=re.DOTALL)
+    for pattern in NOTE_PATTERNS:
+        description = pattern.sub('', description)
     return description.strip()
\ No newline at end of file
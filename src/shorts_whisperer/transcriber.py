@@ -1,27 +1,34 @@
 """
-Video transcription module using Whisper
+Video transcription module using Whisper (via faster-whisper)
 """
 
 import os
-import json
-import tempfile
-import warnings
 import contextlib
+import functools
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional, IO
+from typing import List, Dict, Any, Optional, IO, Union, TYPE_CHECKING
 
-import whisper
-from moviepy import VideoFileClip
+import orjson
 
+# numpy and faster-whisper are slow to import and only needed for
+# transcription, so they are imported lazily in the functions that use them
+if TYPE_CHECKING:
+    import numpy as np
+    from faster_whisper import WhisperModel
 
-# Suppress specific warnings
-warnings.filterwarnings("ignore", message="FP16 is not supported on CPU; using FP32 instead")
+
+# Sample rate expected by Whisper
+SAMPLE_RATE = 16000
 
 
 @dataclass
 class Segment:
     """A segment of transcribed text with timing information."""
+    __slots__ = ("start", "end", "text")
+
     start: float
     end: float
     text: str
@@ -37,14 +44,33 @@ class Segment:
 
 @dataclass
 class Transcript:
-    """A complete transcript with segments and metadata."""
+    """
+    A complete transcript with segments and metadata.
+
+    The full text is cached; add segments with add_segment() (or assign a new
+    segments list) rather than mutating the list in place so the cache stays valid.
+    """
     segments: List[Segment] = field(default_factory=list)
     language: str = ""
+    _full_text: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Replacing the segments invalidates the cached full text
+        if name == "segments":
+            object.__setattr__(self, "_full_text", None)
+        object.__setattr__(self, name, value)
 
     @property
     def full_text(self) -> str:
         """Get the full transcript text."""
-        return " ".join(segment.text for segment in self.segments)
+        if self._full_text is None:
+            self._full_text = " ".join(segment.text for segment in self.segments)
+        return self._full_text
+
+    def add_segment(self, segment: Segment) -> None:
+        """Append a segment to the transcript."""
+        self.segments.append(segment)
+        self._full_text = None
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert transcript to dictionary."""
@@ -56,15 +82,15 @@ class Transcript:
 
     def save_json(self, path: Path) -> None:
         """Save transcript to JSON file."""
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(self.to_dict(), option=orjson.OPT_INDENT_2))
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "Transcript":
         """Create transcript from dictionary."""
         transcript = cls(language=data.get("language", ""))
         for segment_data in data.get("segments", []):
-            transcript.segments.append(
+            transcript.add_segment(
                 Segment(
                     start=segment_data["start"],
                     end=segment_data["end"],
@@ -76,8 +102,8 @@ class Transcript:
     @classmethod
     def from_json(cls, path: Path) -> "Transcript":
         """Load transcript from JSON file."""
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        with open(path, "rb") as f:
+            data = orjson.loads(f.read())
 
         # Check if the data is a list (alternative format)
         if isinstance(data, list):
@@ -98,7 +124,7 @@ class Transcript:
 
                 # Add the segment
                 if text:
-                    transcript.segments.append(
+                    transcript.add_segment(
                         Segment(
                             start=start_time,
                             end=end_time,
@@ -126,58 +152,91 @@ def suppress_stdout_stderr():
             os.dup2(old_stderr, 2)
 
 
-def extract_audio(video_path: str) -> str:
-    """Extract audio from video file."""
-    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-        temp_path = temp_file.name
+def load_audio(video_path: Union[str, Path], sample_rate: int = SAMPLE_RATE) -> "np.ndarray":
+    """
+    Decode the audio track of a video file into memory using ffmpeg.
 
-    # Suppress output during audio extraction
-    with suppress_stdout_stderr():
-        video = VideoFileClip(video_path)
-        video.audio.write_audiofile(temp_path, logger=None)
-        video.close()
+    The audio is downmixed to mono and resampled to the rate Whisper expects,
+    then piped straight into a numpy array without a temporary file.
 
-    return temp_path
+    Args:
+        video_path: Path to the video file
+        sample_rate: Target sample rate in Hz
 
+    Returns:
+        A float32 array of samples in the range [-1.0, 1.0]
+    """
+    import numpy as np
+
+    cmd = [
+        "ffmpeg",
+        "-nostdin",
+        "-i", video_path,
+        "-vn",
+        "-ac", "1",
+        "-ar", str(sample_rate),
+        "-f", "s16le",
+        "-acodec", "pcm_s16le",
+        "-",
+    ]
 
-def transcribe_video(video_path: str, model_name: str = "base") -> Transcript:
+    try:
+        proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to extract audio: {e.stderr.decode(errors='replace')}") from e
+
+    return np.frombuffer(proc.stdout, np.int16).astype(np.float32) / 32768.0
+
+
+@functools.lru_cache(maxsize=2)
+def _get_model(model_name: str, compute_type: str = "int8") -> "WhisperModel":
+    """Load a Whisper model, reusing it if it was already loaded in this process."""
+    from faster_whisper import WhisperModel
+
+    return WhisperModel(model_name, device="auto", compute_type=compute_type)
+
+
+def transcribe_video(
+    video_path: Union[str, Path],
+    model_name: str = "base",
+    compute_type: str = "int8",
+    language: Optional[str] = None
+) -> Transcript:
     """
     Transcribe a video file using Whisper.
 
     Args:
         video_path: Path to the video file
         model_name: Whisper model name (tiny, base, small, medium, large)
+        compute_type: CTranslate2 compute type, e.g. int8 or float32
+        language: Language code of the audio, or None to detect it
 
     Returns:
         A Transcript object with the transcription results
     """
-    # Extract audio from video
-    audio_path = extract_audio(video_path)
-
-    try:
-        # Load Whisper model and transcribe with suppressed output
-        with suppress_stdout_stderr():
-            # Load Whisper model
-            model = whisper.load_model(model_name)
+    # Load Whisper model and transcribe with suppressed output
+    with suppress_stdout_stderr():
+        # Extract audio from video while the Whisper model (cached across
+        # calls) loads; both release the GIL while they wait on I/O
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            audio_future = executor.submit(load_audio, video_path)
+            model_future = executor.submit(_get_model, model_name, compute_type)
+            audio = audio_future.result()
+            model = model_future.result()
 
-            # Transcribe audio
-            result = model.transcribe(audio_path)
+        # Transcribe audio; segments are decoded lazily while iterating
+        segments, info = model.transcribe(audio, beam_size=1, language=language)
 
         # Create transcript
-        transcript = Transcript(language=result.get("language", ""))
+        transcript = Transcript(language=info.language)
 
-        for segment in result.get("segments", []):
-            transcript.segments.append(
+        for segment in segments:
+            transcript.add_segment(
                 Segment(
-                    start=segment["start"],
-                    end=segment["end"],
-                    text=segment["text"].strip()
+                    start=segment.start,
+                    end=segment.end,
+                    text=segment.text.strip()
                 )
             )
 
-        return transcript
-
-    finally:
-        # Clean up temporary audio file
-        if os.path.exists(audio_path):
-            os.unlink(audio_path)
\ No newline at end of file
+    return transcript
@@ -0,0 +1,91 @@
+"""
+Shared fixtures for the test suite
+"""
+
+import sys
+from unittest import mock
+
+import pytest
+from click.testing import CliRunner
+
+
+def _ollama_module():
+    """A stand-in for the ollama module whose async client can be closed."""
+    module = mock.MagicMock()
+    module.AsyncClient.return_value._client.aclose = mock.AsyncMock()
+    return module
+
+
+# Stub out the heavy dependencies before anything imports them, so no test
+# loads a real Whisper model or talks to Ollama, and collection never pays
+# for importing faster-whisper and CTranslate2
+sys.modules["faster_whisper"] = mock.MagicMock()
+sys.modules["ollama"] = _ollama_module()
+
+from shorts_whisperer.transcriber import Segment, Transcript  # noqa: E402
+
+# Text of the sample clip transcript, and the title and description the mocked generator returns
+FULL_TEXT = "Hello world"
+TITLE = "Test Title"
+DESC = "Test Description"
+
+
+@pytest.fixture(scope="session")
+def runner():
+    """A click test runner, shared since it keeps no state between invocations."""
+    return CliRunner()
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path_factory, monkeypatch):
+    """Give every test its own empty cache so cached responses never leak between tests."""
+    path = tmp_path_factory.mktemp("cache")
+    monkeypatch.setenv("SHORTS_WHISPERER_CACHE_DIR", str(path))
+    return path
+
+
+@pytest.fixture
+def mock_ollama():
+    """A fresh ollama module for tests that assert on the calls made to it."""
+    # ollama is imported lazily inside the generator functions, so replace the module itself
+    mock_module = _ollama_module()
+    with mock.patch.dict(sys.modules, {"ollama": mock_module}):
+        yield mock_module
+
+
+@pytest.fixture(scope="session")
+def sample_transcript():
+    """A short "Hello world" clip transcript, shared by tests that only read it."""
+    return Transcript(
+        segments=[
+            Segment(start=0.0, end=1.0, text="Hello"),
+            Segment(start=1.0, end=2.0, text="world")
+        ],
+        language="en"
+    )
+
+
+@pytest.fixture(scope="session")
+def sample_full_transcript():
+    """A full episode transcript that contains the sample clip."""
+    words = ["Hello", "world", "This", "is", "a", "full", "episode"]
+    return Transcript(
+        segments=[Segment(start=float(i), end=float(i + 1), text=word) for i, word in enumerate(words)],
+        language="en"
+    )
+
+
+@pytest.fixture(scope="session")
+def saved_transcript_path(tmp_path_factory, sample_transcript):
+    """The sample transcript saved as JSON once for the whole session."""
+    path = tmp_path_factory.mktemp("json") / "transcript.json"
+    sample_transcript.save_json(path)
+    return path
+
+
+@pytest.fixture(scope="session")
+def empty_transcript_json_path(tmp_path_factory):
+    """An empty transcript JSON file, written once for the whole session."""
+    path = tmp_path_factory.mktemp("json") / "empty.json"
+    path.write_bytes(b'{"language": "en", "segments": [], "text": ""}')
+    return path
@@ -3,121 +3,243 @@ Tests for the CLI module
 """
 
 import os
-import tempfile
-from pathlib import Path
 from unittest import mock
 
 import pytest
-from click.testing import CliRunner
 
-# Mock the imports that are causing issues
-mock.patch("shorts_whisperer.transcriber.whisper", return_value=mock.MagicMock()).start()
-mock.patch("shorts_whisperer.transcriber.VideoFileClip", return_value=mock.MagicMock()).start()
-mock.patch("shorts_whisperer.generator.ollama", return_value=mock.MagicMock()).start()
+from shorts_whisperer.cli import main, _prefetch
+from shorts_whisperer.transcriber import Segment, Transcript
+from shorts_whisperer.generator import preload_model
 
-from shorts_whisperer.cli import main
-from shorts_whisperer.transcriber import Transcript, Segment
+from .conftest import TITLE, DESC
+
+# Keyword arguments the CLI passes to generate_title_description for a single clip
+EXPECTED_CALL_KWARGS = {"filename": "fake.mp4", "full_transcript": None, "use_cache": True, "num_ctx": 2048}
+
+
+@pytest.fixture(autouse=True)
+def mock_thread():
+    # Keep the background model preload from touching the shared ollama mocks
+    with mock.patch("shorts_whisperer.cli.threading.Thread") as mock_func:
+        yield mock_func
 
 
 @pytest.fixture
-def mock_transcribe():
+def mock_transcribe(sample_transcript):
     with mock.patch("shorts_whisperer.cli.transcribe_video") as mock_func:
-        # Create a test transcript
-        segments = [
-            Segment(start=0.0, end=1.0, text="Hello"),
-            Segment(start=1.0, end=2.0, text="world")
-        ]
-        transcript = Transcript(segments=segments, language="en")
-        mock_func.return_value = transcript
+        mock_func.return_value = sample_transcript
+        yield mock_func
+
+
+@pytest.fixture
+def mock_agenerate():
+    with mock.patch("shorts_whisperer.cli.agenerate_title_description") as mock_func:
+        mock_func.side_effect = mock.AsyncMock(return_value=(TITLE, DESC))
         yield mock_func
 
 
 @pytest.fixture
 def mock_generate():
     with mock.patch("shorts_whisperer.cli.generate_title_description") as mock_func:
-        mock_func.return_value = ("Test Title", "Test Description")
+        mock_func.return_value = (TITLE, DESC)
         yield mock_func
 
 
-def test_cli_basic(mock_transcribe, mock_generate):
-    runner = CliRunner()
-    with tempfile.NamedTemporaryFile(suffix=".mp4") as temp_file:
-        result = runner.invoke(main, ["--input", temp_file.name])
-
-        assert result.exit_code == 0
-        assert mock_transcribe.called
-        assert mock_generate.called
-        assert "Test Title" in result.output
-        assert "Test Description" in result.output
-
-
-def test_cli_with_output(mock_transcribe, mock_generate):
-    runner = CliRunner()
-    with tempfile.NamedTemporaryFile(suffix=".mp4") as video_file, \
-         tempfile.NamedTemporaryFile(suffix=".txt", delete=False) as output_file:
-        output_path = Path(output_file.name)
-
-        try:
-            result = runner.invoke(main, [
-                "--input", video_file.name,
-                "--output", output_path
-            ])
-
-            assert result.exit_code == 0
-            assert mock_transcribe.called
-            assert mock_generate.called
-            assert os.path.exists(output_path)
-
-            content = output_path.read_text()
-            assert "Test Title" in content
-            assert "Test Description" in content
-        finally:
-            if os.path.exists(output_path):
-                os.unlink(output_path)
-
-
-def test_cli_with_transcript(mock_transcribe, mock_generate):
-    runner = CliRunner()
-    with tempfile.NamedTemporaryFile(suffix=".mp4") as video_file, \
-         tempfile.NamedTemporaryFile(suffix=".json", delete=False) as transcript_file:
-        transcript_path = Path(transcript_file.name)
-
-        # Write valid JSON to the transcript file
-        transcript_file.write(b'{"language": "en", "segments": [], "text": ""}')
-        transcript_file.flush()
-
-        try:
-            result = runner.invoke(main, [
-                "--input", video_file.name,
-                "--full-transcript", transcript_path
-            ])
-
-            assert result.exit_code == 0
-            assert mock_transcribe.called
-            assert mock_generate.called
-            assert os.path.exists(transcript_path)
-        finally:
-            if os.path.exists(transcript_path):
-                os.unlink(transcript_path)
-
-
-def test_cli_with_custom_model(mock_transcribe, mock_generate):
-    runner = CliRunner()
-    with tempfile.NamedTemporaryFile(suffix=".mp4") as temp_file:
-        result = runner.invoke(main, [
-            "--input", temp_file.name,
-            "--model", "custom-model"
-        ])
-
-        assert result.exit_code == 0
-        assert mock_transcribe.called
-        # Updated assertion to match the new function signature
-        mock_generate.assert_called_with(
-            mock_transcribe.return_value,
-            "custom-model",
-            None,
-            filename=os.path.basename(temp_file.name),
-            full_transcript=None
-        )
-        assert "Test Title" in result.output
-        assert "Test Description" in result.output
\ No newline at end of file
+@pytest.fixture
+def video_path(tmp_path):
+    # Click checks that the input exists, even though transcription is mocked
+    path = tmp_path / EXPECTED_CALL_KWARGS["filename"]
+    path.touch()
+    return path
+
+
+def test_cli_basic(runner, video_path, mock_transcribe, mock_generate):
+    result = runner.invoke(main, ["--input", str(video_path)])
+
+    assert result.exit_code == 0
+    assert mock_transcribe.called
+    assert mock_generate.called
+    assert TITLE in result.output
+    assert DESC in result.output
+
+
+def test_cli_with_output(runner, tmp_path, video_path, mock_transcribe, mock_generate):
+    output_path = tmp_path / "output.txt"
+
+    result = runner.invoke(main, [
+        "--input", str(video_path),
+        "--output", str(output_path)
+    ])
+
+    assert result.exit_code == 0
+    assert mock_transcribe.called
+    assert mock_generate.called
+
+    content = output_path.read_text()
+    assert TITLE in content
+    assert DESC in content
+
+
+def test_cli_with_transcript(runner, video_path, empty_transcript_json_path, mock_transcribe, mock_generate):
+    result = runner.invoke(main, [
+        "--input", str(video_path),
+        "--full-transcript", str(empty_transcript_json_path)
+    ])
+
+    assert result.exit_code == 0
+    assert mock_transcribe.called
+    # The full transcript was read and passed on as context
+    assert mock_generate.call_args[1]["full_transcript"] is not None
+
+
+def test_cli_with_custom_model(mock_thread, runner, video_path, mock_transcribe, mock_generate):
+    result = runner.invoke(main, [
+        "--input", str(video_path),
+        "--model", "custom-model"
+    ])
+
+    assert result.exit_code == 0
+    assert mock_transcribe.called
+    # The model is preloaded in the background before transcription
+    mock_thread.assert_called_once_with(
+        target=preload_model, args=("custom-model",), kwargs={"num_ctx": 2048}, daemon=True
+    )
+    assert mock_thread.return_value.start.called
+    # Updated assertion to match the new function signature
+    mock_generate.assert_called_with(mock_transcribe.return_value, "custom-model", None, **EXPECTED_CALL_KWARGS)
+    assert TITLE in result.output
+    assert DESC in result.output
+
+
+def test_cli_with_multiple_inputs(runner, tmp_path, mock_transcribe, mock_generate, mock_agenerate):
+    first_path = tmp_path / "first.mp4"
+    second_path = tmp_path / "second.mp4"
+    first_path.touch()
+    second_path.touch()
+
+    result = runner.invoke(main, [
+        "--input", str(first_path),
+        "--input", str(second_path)
+    ])
+
+    assert result.exit_code == 0
+    assert mock_transcribe.call_count == 2
+    assert mock_agenerate.call_count == 2
+    assert not mock_generate.called
+    # Each clip checks Ollama itself, and only when it has no cached response
+    assert "validate" not in mock_agenerate.call_args[1]
+    # Both clips share one client
+    clients = {id(call[1]["client"]) for call in mock_agenerate.call_args_list}
+    assert len(clients) == 1
+    assert "first.mp4" in result.output
+    assert "second.mp4" in result.output
+    assert result.output.count(TITLE) == 2
+
+
+def test_cli_with_multiple_cached_inputs(runner, tmp_path, mock_ollama):
+    first_path = tmp_path / "first.mp4"
+    second_path = tmp_path / "second.mp4"
+    first_path.touch()
+    second_path.touch()
+    args = ["--input", str(first_path), "--input", str(second_path)]
+
+    async def stream(**kwargs):
+        yield {"message": {"content": "# Hello World\n\nA simple greeting to the world."}}
+
+    mock_ollama.AsyncClient.return_value.chat = mock.AsyncMock(side_effect=stream)
+    with mock.patch("shorts_whisperer.cli.transcribe_video", side_effect=[
+        Transcript(segments=[Segment(start=0.0, end=1.0, text=text)]) for text in ("Hello", "Goodbye")
+    ] * 2):
+        assert runner.invoke(main, args).exit_code == 0
+
+        # Ollama is no longer reachable, but both clips are cached
+        mock_ollama.show.reset_mock()
+        mock_ollama.show.side_effect = ConnectionError("Failed to connect to Ollama")
+        result = runner.invoke(main, args)
+
+    assert result.exit_code == 0
+    assert not mock_ollama.show.called
+    assert mock_ollama.AsyncClient.return_value.chat.await_count == 2
+    # One client per run, closed once the clips are done
+    assert mock_ollama.AsyncClient.call_count == 2
+    assert mock_ollama.AsyncClient.return_value._client.aclose.await_count == 2
+    assert result.output.count("Hello World") == 2
+
+
+@mock.patch("shorts_whisperer.cli.generate_titles_batch")
+def test_cli_with_batch(mock_batch, runner, tmp_path, mock_transcribe, mock_generate, mock_agenerate):
+    mock_batch.return_value = [("First Title", "First Description"), ("Second Title", "Second Description")]
+    first_path = tmp_path / "first.mp4"
+    second_path = tmp_path / "second.mp4"
+    first_path.touch()
+    second_path.touch()
+
+    result = runner.invoke(main, [
+        "--input", str(first_path),
+        "--input", str(second_path),
+        "--batch"
+    ])
+
+    assert result.exit_code == 0
+    # Both clips go to Ollama in one request
+    mock_batch.assert_called_once_with(
+        [mock_transcribe.return_value, mock_transcribe.return_value],
+        "llama3.2:latest",
+        full_transcript=None,
+        use_cache=True,
+        num_ctx=2048
+    )
+    assert not mock_agenerate.called
+    assert "First Title" in result.output
+    assert "Second Title" in result.output
+
+
+@mock.patch("shorts_whisperer.cli.generate_titles_batch")
+def test_cli_with_batch_and_prompt_template(mock_batch, runner, tmp_path, video_path, mock_transcribe, mock_generate):
+    template_path = tmp_path / "template.txt"
+    template_path.write_text("Title for: {transcript}")
+    second_path = tmp_path / "second.mp4"
+    second_path.touch()
+
+    # With a single input --batch does nothing, so the template is used as usual
+    result = runner.invoke(main, [
+        "--input", str(video_path),
+        "--batch",
+        "--prompt-template", str(template_path)
+    ])
+
+    assert result.exit_code == 0
+    assert mock_generate.call_args[0][2] == "Title for: {transcript}"
+
+    # With multiple inputs the batch prompt can't use a custom template
+    result = runner.invoke(main, [
+        "--input", str(video_path),
+        "--input", str(second_path),
+        "--batch",
+        "--prompt-template", str(template_path)
+    ])
+
+    assert result.exit_code == 2
+    assert "--batch cannot be combined with --prompt-template" in result.output
+    assert not mock_batch.called
+
+
+def test_cli_with_no_cache(runner, video_path, mock_transcribe, mock_generate):
+    result = runner.invoke(main, ["--input", str(video_path), "--no-cache"])
+
+    assert result.exit_code == 0
+    assert mock_generate.call_args[1]["use_cache"] is False
+
+
+@pytest.mark.skipif(not hasattr(os, "posix_fadvise"), reason="posix_fadvise is not available")
+@mock.patch("shorts_whisperer.cli.os.posix_fadvise")
+def test_prefetch(mock_fadvise, video_path):
+    _prefetch(video_path)
+
+    # The whole file is flagged for read-ahead
+    assert mock_fadvise.call_args[0][1:] == (0, 0, os.POSIX_FADV_WILLNEED)
+
+
+def test_prefetch_missing_file(tmp_path):
+    # Prefetching is best effort and must not raise
+    _prefetch(tmp_path / "missing.mp4")
@@ -2,35 +2,117 @@
 Tests for the generator module
 """
 
+import re
+import asyncio
 from unittest import mock
 import pytest
 
-# Mock the imports that are causing issues
-mock.patch("ollama.chat", return_value={"message": {"content": ""}}).start()
-
 from shorts_whisperer.transcriber import Segment, Transcript
-from shorts_whisperer.generator import generate_title_description
+from shorts_whisperer.generator import (
+    check_ollama_availability,
+    context_size,
+    generate_title_description,
+    agenerate_title_description,
+    generate_titles_batch,
+    preload_model,
+    run_context_size,
+    summarize_full_transcript
+)
 
 
-@mock.patch("shorts_whisperer.generator.check_ollama_availability", return_value=True)
-@mock.patch("shorts_whisperer.generator.ollama")
-def test_generate_title_description_success(mock_ollama, mock_check):
-    # Create a test transcript
-    segments = [
-        Segment(start=0.0, end=1.0, text="Hello"),
-        Segment(start=1.0, end=2.0, text="world")
-    ]
-    transcript = Transcript(segments=segments, language="en")
+# The summary and the clip transcript, in the order the prompt template uses
+_PROMPT_RX = re.compile(
+    r"FULL EPISODE SUMMARY.*An episode that greets the world\..*SHORT CLIP TRANSCRIPT.*Hello world",
+    re.DOTALL
+)
 
-    # Mock the Ollama response
-    mock_ollama.chat.return_value = {
-        "message": {
-            "content": "TITLE: Hello World\nDESCRIPTION: A simple greeting to the world."
-        }
-    }
+
+def stream_response(*parts):
+    """Mimic a streamed ollama.chat response."""
+    for part in parts:
+        yield {"message": {"content": part}}
+
+
+async def astream_response(*parts):
+    """Mimic a streamed ollama.AsyncClient.chat response."""
+    for part in parts:
+        yield {"message": {"content": part}}
+
+
+def test_context_size():
+    # Short prompts get the minimum context
+    assert context_size("x" * 100, 400) == 2048
+    # Longer prompts are rounded up to the next power of two
+    assert context_size("x" * 4 * 5000, 400) == 8192
+    # Very long prompts are capped
+    assert context_size("x" * 4 * 100000, 400) == 32768
+
+
+class FakeResponseError(Exception):
+    """Stand-in for ollama.ResponseError."""
+    def __init__(self, error, status_code):
+        super().__init__(error)
+        self.error = error
+        self.status_code = status_code
+
+
+def test_check_ollama_availability(mock_ollama):
+    assert check_ollama_availability("test-model")
+
+    # A single lookup of the model, no listing
+    mock_ollama.show.assert_called_once_with("test-model")
+    assert not mock_ollama.list.called
+
+
+def test_check_ollama_availability_missing_model(mock_ollama):
+    mock_ollama.ResponseError = FakeResponseError
+    mock_ollama.show.side_effect = FakeResponseError("model 'test-model' not found", 404)
+
+    assert not check_ollama_availability("test-model")
+
+    # Installed models are only listed for the error message
+    assert mock_ollama.list.called
+
+
+def test_check_ollama_availability_not_running(mock_ollama):
+    mock_ollama.ResponseError = FakeResponseError
+    mock_ollama.show.side_effect = ConnectionError("Failed to connect to Ollama")
+
+    assert not check_ollama_availability("test-model")
+
+
+def test_preload_model(mock_ollama):
+    preload_model("test-model")
+
+    mock_ollama.generate.assert_called_once_with(
+        model="test-model",
+        prompt="",
+        keep_alive="30m",
+        options={"num_ctx": 2048}
+    )
+
+
+def test_preload_model_error(mock_ollama):
+    mock_ollama.generate.side_effect = Exception("connection refused")
+
+    # Preloading is best effort and must not raise
+    preload_model("test-model")
+
+    assert mock_ollama.generate.called
+
+
+@pytest.mark.parametrize("content", [
+    "TITLE: Hello World\nDESCRIPTION: A simple greeting to the world.",
+    "Hello World\n\nA simple greeting to the world.",
+    "# Hello World\n\nA simple greeting to the world.",
+], ids=["labels", "plain", "markdown"])
+@mock.patch("shorts_whisperer.generator.check_ollama_availability", return_value=True)
+def test_generate_title_description_success(mock_check, mock_ollama, sample_transcript, content):
+    # Mock the Ollama response in each of the formats models tend to use
+    mock_ollama.chat.return_value = stream_response(content)
 
     # Call the function
-    title, description = generate_title_description(transcript, model="test-model")
+    title, description = generate_title_description(sample_transcript, model="test-model")
 
     # Verify
     assert mock_check.called
@@ -40,44 +122,119 @@ def test_generate_title_description_success(mock_ollama, mock_check):
 
 
 @mock.patch("shorts_whisperer.generator.check_ollama_availability", return_value=True)
-@mock.patch("shorts_whisperer.generator.ollama")
-def test_generate_title_description_alternative_format(mock_ollama, mock_check):
-    # Create a test transcript
-    segments = [
-        Segment(start=0.0, end=1.0, text="Hello"),
-        Segment(start=1.0, end=2.0, text="world")
-    ]
-    transcript = Transcript(segments=segments, language="en")
+def test_generate_title_description_stops_after_description(mock_check, mock_ollama, sample_transcript):
+    consumed = []
+
+    def chunks():
+        for part in ["# Hello World\n\n", "A simple greeting", " to the world.\n\n", "(Note: not needed)"]:
+            consumed.append(part)
+            yield {"message": {"content": part}}
+
+    mock_ollama.chat.return_value = chunks()
+
+    title, description = generate_title_description(sample_transcript, model="test-model")
+
+    # Generation stops once the description paragraph has ended
+    assert consumed[-1] == " to the world.\n\n"
+    assert title == "Hello World"
+    assert description == "A simple greeting to the world."
+    assert mock_ollama.chat.call_args[1]["stream"] is True
+    assert mock_ollama.chat.call_args[1]["options"] == {"num_predict": 400, "temperature": 0.4, "num_ctx": 2048}
+
+
+@mock.patch("shorts_whisperer.generator.check_ollama_availability", return_value=True)
+def test_agenerate_title_description(mock_check, mock_ollama, sample_transcript):
+    # Mock the async Ollama client
+    mock_ollama.AsyncClient.return_value.chat = mock.AsyncMock(
+        side_effect=lambda **kwargs: astream_response("# Hello World\n\n", "A simple greeting to the world.")
+    )
+
+    # Run two generations concurrently
+    async def run():
+        return await asyncio.gather(
+            agenerate_title_description(sample_transcript, model="test-model"),
+            agenerate_title_description(
+                Transcript(segments=[Segment(start=0.0, end=1.0, text="Goodbye world")]),
+                model="test-model"
+            ),
+        )
+
+    results = asyncio.run(run())
+
+    # Verify
+    assert mock_check.called
+    assert mock_ollama.AsyncClient.return_value.chat.await_count == 2
+    assert not mock_ollama.chat.called
+    assert results == [("Hello World", "A simple greeting to the world.")] * 2
+    # Without a shared client each call closes the one it opened
+    assert mock_ollama.AsyncClient.return_value._client.aclose.await_count == 2
+
+
+@mock.patch("shorts_whisperer.generator.check_ollama_availability")
+def test_generate_title_description_without_validation(mock_check, mock_ollama, sample_transcript):
+    mock_ollama.chat.return_value = stream_response("# Hello World\n\nA simple greeting to the world.")
 
-    # Mock the Ollama response with a different format
+    title, description = generate_title_description(sample_transcript, model="test-model", validate=False)
+
+    # The availability check is skipped
+    assert not mock_check.called
+    assert title == "Hello World"
+
+
+@mock.patch("shorts_whisperer.generator.check_ollama_availability", return_value=True)
+def test_generate_titles_batch(mock_check, mock_ollama):
+    transcripts = [
+        Transcript(segments=[Segment(start=0.0, end=1.0, text="Hello")], language="en"),
+        Transcript(segments=[Segment(start=0.0, end=1.0, text="Goodbye")], language="en")
+    ]
     mock_ollama.chat.return_value = {
         "message": {
-            "content": "Hello World\n\nA simple greeting to the world."
+            "content": '{"clips": [{"title": "Hello World", "description": "A greeting."}, '
+                       '{"title": "Goodbye World", "description": "A farewell."}]}'
         }
     }
 
-    # Call the function
-    title, description = generate_title_description(transcript, model="test-model")
+    results = generate_titles_batch(transcripts, model="test-model")
 
-    # Verify
-    assert mock_check.called
-    assert mock_ollama.chat.called
-    assert title == "Hello World"
-    assert description == "A simple greeting to the world."
+    # Verify a single JSON request covering both clips
+    assert mock_ollama.chat.call_count == 1
+    call_args = mock_ollama.chat.call_args[1]
+    assert call_args["format"] == "json"
+    prompt = call_args["messages"][0]["content"]
+    assert "## Clip 1\nHello" in prompt
+    assert "## Clip 2\nGoodbye" in prompt
+    assert results == [("Hello World", "A greeting."), ("Goodbye World", "A farewell.")]
 
 
-@mock.patch("shorts_whisperer.generator.check_ollama_availability", return_value=False)
-def test_generate_title_description_ollama_unavailable(mock_check):
-    # Create a test transcript
-    segments = [
-        Segment(start=0.0, end=1.0, text="Hello"),
-        Segment(start=1.0, end=2.0, text="world")
+@pytest.mark.parametrize("content", [
+    '{"clips": [{"title": "Hello World", "description": "A greeting."}]}',
+    '{"clips": [{"title": "Hello World", "description": "A greeting."}, {"title": "Goodbye World"}]}',
+    '{"titles": "Hello World"}',
+    'Hello World',
+], ids=["wrong_count", "missing_description", "no_clips", "not_json"])
+@mock.patch("shorts_whisperer.generator.check_ollama_availability", return_value=True)
+def test_generate_titles_batch_malformed_response(mock_check, mock_ollama, caplog, content):
+    transcripts = [
+        Transcript(segments=[Segment(start=0.0, end=1.0, text="Hello")], language="en"),
+        Transcript(segments=[Segment(start=0.0, end=1.0, text="Goodbye")], language="en")
     ]
-    transcript = Transcript(segments=segments, language="en")
+    mock_ollama.chat.return_value = {"message": {"content": content}}
 
+    # A response that doesn't cover every clip is an error
+    with pytest.raises(SystemExit) as exc_info:
+        generate_titles_batch(transcripts, model="test-model")
+
+    assert exc_info.value.code == 1
+    # The response is blamed, not the connection
+    assert "malformed batch response" in caplog.text
+    assert "Error calling Ollama" not in caplog.text
+
+
+@mock.patch("shorts_whisperer.generator.check_ollama_availability", return_value=False)
+def test_generate_title_description_ollama_unavailable(mock_check, sample_transcript):
     # Call the function and expect SystemExit
     with pytest.raises(SystemExit) as exc_info:
-        generate_title_description(transcript, model="test-model")
+        generate_title_description(sample_transcript, model="test-model")
 
     # Verify exit code
     assert exc_info.value.code == 1
@@ -85,21 +242,13 @@ def test_generate_title_description_ollama_unavailable(mock_check):
 
 
 @mock.patch("shorts_whisperer.generator.check_ollama_availability", return_value=True)
-@mock.patch("shorts_whisperer.generator.ollama")
-def test_generate_title_description_error(mock_ollama, mock_check):
-    # Create a test transcript
-    segments = [
-        Segment(start=0.0, end=1.0, text="Hello"),
-        Segment(start=1.0, end=2.0, text="world")
-    ]
-    transcript = Transcript(segments=segments, language="en")
-
+def test_generate_title_description_error(mock_check, mock_ollama, sample_transcript):
     # Mock the Ollama response to raise an exception
     mock_ollama.chat.side_effect = Exception("API error")
 
     # Call the function and expect SystemExit
     with pytest.raises(SystemExit) as exc_info:
-        generate_title_description(transcript, model="test-model")
+        generate_title_description(sample_transcript, model="test-model")
 
     # Verify exit code and that availability check passed
     assert exc_info.value.code == 1
@@ -107,39 +256,18 @@ def test_generate_title_description_error(mock_ollama, mock_check):
 
 
 @mock.patch("shorts_whisperer.generator.check_ollama_availability", return_value=True)
-@mock.patch("shorts_whisperer.generator.ollama")
-def test_generate_title_description_with_full_transcript(mock_ollama, mock_check):
-    # Create a test clip transcript
-    clip_segments = [
-        Segment(start=0.0, end=1.0, text="Hello"),
-        Segment(start=1.0, end=2.0, text="world")
-    ]
-    clip_transcript = Transcript(segments=clip_segments, language="en")
-
-    # Create a test full episode transcript
-    full_segments = [
-        Segment(start=0.0, end=1.0, text="Hello"),
-        Segment(start=1.0, end=2.0, text="world"),
-        Segment(start=2.0, end=3.0, text="This"),
-        Segment(start=3.0, end=4.0, text="is"),
-        Segment(start=4.0, end=5.0, text="a"),
-        Segment(start=5.0, end=6.0, text="full"),
-        Segment(start=6.0, end=7.0, text="episode")
-    ]
-    full_transcript = Transcript(segments=full_segments, language="en")
-
-    # Mock the Ollama response
-    mock_ollama.chat.return_value = {
-        "message": {
-            "content": "# Hello World\n\nA simple greeting to the world with context from the full episode."
-        }
-    }
+def test_generate_title_description_with_full_transcript(
+    mock_check, mock_ollama, sample_transcript, sample_full_transcript
+):
+    # Mock the Ollama responses
+    mock_ollama.generate.return_value = {"response": "An episode that greets the world."}
+    mock_ollama.chat.return_value = stream_response("# Hello World\n\nA simple greeting to the world with context from the full episode.")
 
     # Call the function with both transcripts
     title, description = generate_title_description(
-        clip_transcript,
+        sample_transcript,
         model="test-model",
-        full_transcript=full_transcript,
+        full_transcript=sample_full_transcript,
         filename="test.mp4"
     )
 
@@ -149,12 +277,117 @@ def test_generate_title_description_with_full_transcript(mock_ollama, mock_check
     assert title == "Hello World"
     assert description == "A simple greeting to the world with context from the full episode."
 
-    # Verify that the prompt contains both transcripts
-    call_args = mock_ollama.chat.call_args[1]
-    messages = call_args["messages"]
-    prompt = messages[0]["content"]
+    # Verify that the full episode was summarized
+    summary_prompt = mock_ollama.generate.call_args[1]["prompt"]
+    assert "Hello world This is a full episode" in summary_prompt
+
+    # Verify that the prompt contains the summary and the clip transcript
+    prompt = mock_ollama.chat.call_args[1]["messages"][0]["content"]
+    assert _PROMPT_RX.search(prompt)
+
+
+def test_summarize_full_transcript_is_cached(mock_ollama, cache_dir):
+    mock_ollama.generate.return_value = {"response": " A short summary. "}
+    full_transcript = Transcript(segments=[Segment(start=0.0, end=1.0, text="A long episode")])
+
+    first = summarize_full_transcript(full_transcript, "test-model")
+    second = summarize_full_transcript(full_transcript, "test-model")
+
+    # The second call is served from the on-disk cache
+    assert first == second == "A short summary."
+    assert mock_ollama.generate.call_count == 1
+    assert len(list(cache_dir.glob("*.summary.txt"))) == 1
+
+
+@mock.patch("shorts_whisperer.generator.check_ollama_availability", return_value=True)
+def test_run_context_size_is_shared(mock_check, mock_ollama, sample_transcript):
+    mock_ollama.generate.return_value = {"response": "An episode that greets the world."}
+    mock_ollama.chat.return_value = stream_response("# Hello World\n\nA greeting.")
+    long_episode = Transcript(segments=[Segment(start=0.0, end=1.0, text="word " * 5000)])
+
+    # The summary prompt is the largest one in the run
+    num_ctx = run_context_size("test-model", long_episode, [sample_transcript])
+    assert num_ctx == 8192
+
+    preload_model("test-model", num_ctx=num_ctx)
+    generate_title_description(sample_transcript, model="test-model", full_transcript=long_episode, num_ctx=num_ctx)
+
+    # The preload, summary and clip requests all use the same size, so Ollama
+    # never reloads the model
+    assert [call[1]["options"]["num_ctx"] for call in mock_ollama.generate.call_args_list] == [8192, 8192]
+    assert mock_ollama.chat.call_args[1]["options"]["num_ctx"] == 8192
+
+    # Once the summary is cached, only the clip prompt is left to size
+    assert run_context_size("test-model", long_episode, [sample_transcript]) == 2048
+
+
+@mock.patch("shorts_whisperer.generator.check_ollama_availability", return_value=True)
+def test_generate_title_description_is_cached(mock_check, mock_ollama, cache_dir, sample_transcript):
+    mock_ollama.chat.side_effect = lambda **kwargs: stream_response(
+        "# Hello World\n\nA simple greeting to the world that everyone can understand."
+    )
+
+    first = generate_title_description(sample_transcript, custom_prompt="Write a title for: {transcript}")
+    # Surrounding whitespace in the prompt doesn't change the cache key
+    second = generate_title_description(sample_transcript, custom_prompt="Write a title for: {transcript}\n")
+
+    assert first == second == ("Hello World", "A simple greeting to the world that everyone can understand.")
+    assert mock_ollama.chat.call_count == 1
+    assert len(list(cache_dir.glob("*.response.txt"))) == 1
+
+    # Without the cache a new response is generated
+    generate_title_description(sample_transcript, custom_prompt="Write a title for: {transcript}", use_cache=False)
+    assert mock_ollama.chat.call_count == 2
+
+
+@mock.patch("shorts_whisperer.generator.check_ollama_availability")
+def test_cached_response_does_not_need_ollama(mock_check, mock_ollama, sample_transcript):
+    mock_check.return_value = True
+    mock_ollama.chat.return_value = stream_response("# Hello World\n\nA simple greeting to the world.")
+    generate_title_description(sample_transcript, model="test-model")
+
+    # Ollama has gone away since the response was cached
+    mock_check.reset_mock()
+    mock_check.return_value = False
+
+    title, description = generate_title_description(sample_transcript, model="test-model")
+
+    assert (title, description) == ("Hello World", "A simple greeting to the world.")
+    assert not mock_check.called
+    assert mock_ollama.chat.call_count == 1
+
+
+@mock.patch("shorts_whisperer.generator.check_ollama_availability", return_value=True)
+def test_empty_response_is_not_cached(mock_check, mock_ollama, cache_dir, sample_transcript):
+    mock_ollama.chat.side_effect = lambda **kwargs: stream_response()
+
+    assert generate_title_description(sample_transcript) == ("", "No description generated.")
+    generate_title_description(sample_transcript)
+
+    # Each run asks Ollama again instead of replaying the empty response
+    assert mock_ollama.chat.call_count == 2
+    assert not list(cache_dir.glob("*.response.txt"))
+
+
+def test_empty_summary_is_not_cached(mock_ollama, cache_dir, sample_full_transcript):
+    mock_ollama.generate.return_value = {"response": "  "}
+
+    assert summarize_full_transcript(sample_full_transcript, "test-model") == ""
+    assert not list(cache_dir.glob("*.summary.txt"))
+
+
+@mock.patch("shorts_whisperer.generator.check_ollama_availability", return_value=True)
+def test_generate_title_description_summary_fallback(mock_check, mock_ollama, sample_transcript, sample_full_transcript):
+    mock_ollama.generate.side_effect = Exception("model crashed")
+    mock_ollama.chat.return_value = stream_response("# Hello World\n\nA simple greeting to the world.")
+
+    generate_title_description(sample_transcript, model="test-model", full_transcript=sample_full_transcript)
+
+    # The instruction follows the transcript, so truncating a long episode from the front keeps it
+    summary_prompt = mock_ollama.generate.call_args[1]["prompt"]
+    assert summary_prompt.index("Hello world This is a full episode") < summary_prompt.index("Summarize")
 
-    assert "FULL EPISODE TRANSCRIPT" in prompt
-    assert "SHORT CLIP TRANSCRIPT" in prompt
-    assert "Hello world This is a full episode" in prompt.replace("\n", " ")
-    assert "Hello world" in prompt
\ No newline at end of file
+    # Without a summary the raw transcript is labelled as such
+    prompt = mock_ollama.chat.call_args[1]["messages"][0]["content"]
+    assert "FULL EPISODE TRANSCRIPT (for context):\nHello world This is a full episode" in prompt
+    assert "FULL EPISODE SUMMARY" not in prompt
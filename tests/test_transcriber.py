@@ -2,25 +2,25 @@
 Tests for the transcriber module
 """
 
-import os
-import json
-import tempfile
-from pathlib import Path
+import sys
+import subprocess
+from types import SimpleNamespace
 from unittest import mock
 
+import numpy as np
+import orjson
 import pytest
 
-# Mock the imports that are causing issues
-mock.patch("whisper.load_model", return_value=mock.MagicMock()).start()
-mock.patch("moviepy.VideoFileClip", return_value=mock.MagicMock()).start()
-
 from shorts_whisperer.transcriber import (
     Segment,
     Transcript,
-    extract_audio,
-    transcribe_video
+    load_audio,
+    transcribe_video,
+    _get_model
 )
 
+from .conftest import FULL_TEXT
+
 
 class TestSegment:
     def test_segment_creation(self):
@@ -29,6 +29,10 @@ class TestSegment:
         assert segment.end == 1.0
         assert segment.text == "Hello world"
 
+    def test_segment_has_no_instance_dict(self):
+        segment = Segment(start=0.0, end=1.0, text="Hello world")
+        assert not hasattr(segment, "__dict__")
+
     def test_segment_to_dict(self):
         segment = Segment(start=0.0, end=1.0, text="Hello world")
         data = segment.to_dict()
@@ -60,92 +64,136 @@ class TestTranscript:
             Segment(start=1.0, end=2.0, text="world")
         ]
         transcript = Transcript(segments=segments)
-        assert transcript.full_text == "Hello world"
+        assert transcript.full_text == FULL_TEXT
 
-    def test_to_dict(self):
+    def test_full_text_is_cached(self):
         segments = [
             Segment(start=0.0, end=1.0, text="Hello"),
             Segment(start=1.0, end=2.0, text="world")
         ]
-        transcript = Transcript(segments=segments, language="en")
-        data = transcript.to_dict()
-        assert data["language"] == "en"
-        assert len(data["segments"]) == 2
-        assert data["text"] == "Hello world"
+        transcript = Transcript(segments=segments)
+
+        # Repeated access returns the same joined string instead of rebuilding it
+        assert transcript.full_text is transcript.full_text
+        assert transcript.to_dict()["text"] is transcript.full_text
+
+    def test_full_text_after_changes(self):
+        transcript = Transcript(segments=[Segment(start=0.0, end=1.0, text="Hello")])
+        assert transcript.full_text == "Hello"
 
-    def test_save_and_load_json(self):
+        # Adding a segment updates the cached text
+        transcript.add_segment(Segment(start=1.0, end=2.0, text="world"))
+        assert transcript.full_text == FULL_TEXT
+
+        # So does replacing the segments
+        transcript.segments = [Segment(start=0.0, end=1.0, text="Goodbye")]
+        assert transcript.full_text == "Goodbye"
+
+    def test_to_dict(self):
         segments = [
             Segment(start=0.0, end=1.0, text="Hello"),
             Segment(start=1.0, end=2.0, text="world")
         ]
         transcript = Transcript(segments=segments, language="en")
+        data = transcript.to_dict()
+        assert data["language"] == "en"
+        assert len(data["segments"]) == 2
+        assert data["text"] == FULL_TEXT
 
-        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as temp_file:
-            temp_path = Path(temp_file.name)
+    def test_save_json(self, tmp_path, sample_transcript):
+        path = tmp_path / "transcript.json"
 
-        try:
-            # Save to JSON
-            transcript.save_json(temp_path)
+        sample_transcript.save_json(path)
 
-            # Load from JSON
-            loaded = Transcript.from_json(temp_path)
+        assert orjson.loads(path.read_bytes()) == sample_transcript.to_dict()
 
-            # Verify
-            assert loaded.language == "en"
-            assert len(loaded.segments) == 2
-            assert loaded.full_text == "Hello world"
-        finally:
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
+    def test_load_json(self, saved_transcript_path):
+        loaded = Transcript.from_json(saved_transcript_path)
 
+        assert loaded.language == "en"
+        assert len(loaded.segments) == 2
+        assert loaded.full_text == FULL_TEXT
 
-@mock.patch("shorts_whisperer.transcriber.VideoFileClip")
-def test_extract_audio(mock_video_clip):
-    # Mock the video clip
-    mock_video = mock.MagicMock()
-    mock_audio = mock.MagicMock()
-    mock_video.audio = mock_audio
-    mock_video_clip.return_value = mock_video
+
+@mock.patch("shorts_whisperer.transcriber.subprocess.run")
+def test_load_audio(mock_run):
+    # Mock ffmpeg writing 16-bit PCM samples to stdout
+    samples = np.array([0, 16384, -32768], dtype=np.int16)
+    mock_run.return_value = mock.MagicMock(stdout=samples.tobytes())
 
     # Call the function
-    result = extract_audio("test_video.mp4")
+    audio = load_audio("test_video.mp4")
 
     # Verify
-    assert mock_video_clip.called
-    assert mock_audio.write_audiofile.called
-    assert os.path.exists(result)
+    cmd = mock_run.call_args[0][0]
+    assert cmd[0] == "ffmpeg"
+    assert "test_video.mp4" in cmd
+    # Audio is piped through stdout rather than written to a temporary file
+    assert cmd[-1] == "-"
+    assert mock_run.call_args[1]["stdout"] == subprocess.PIPE
+    assert audio.dtype == np.float32
+    assert audio.tolist() == [0.0, 0.5, -1.0]
+
 
-    # Clean up
-    os.unlink(result)
+@mock.patch("shorts_whisperer.transcriber.subprocess.run")
+def test_load_audio_error(mock_run):
+    mock_run.side_effect = subprocess.CalledProcessError(1, "ffmpeg", stderr=b"No such file")
 
+    with pytest.raises(RuntimeError, match="No such file"):
+        load_audio("missing.mp4")
 
-@mock.patch("shorts_whisperer.transcriber.whisper")
-@mock.patch("shorts_whisperer.transcriber.extract_audio")
-def test_transcribe_video(mock_extract_audio, mock_whisper):
+
+@mock.patch("faster_whisper.WhisperModel")
+@mock.patch("shorts_whisperer.transcriber.load_audio")
+def test_transcribe_video(mock_load_audio, mock_whisper_model):
     # Mock the audio extraction
-    mock_extract_audio.return_value = "test_audio.wav"
-
-    # Mock the whisper model
-    mock_model = mock.MagicMock()
-    mock_whisper.load_model.return_value = mock_model
-
-    # Mock the transcription result
-    mock_model.transcribe.return_value = {
-        "language": "en",
-        "segments": [
-            {"start": 0.0, "end": 1.0, "text": "Hello"},
-            {"start": 1.0, "end": 2.0, "text": "world"}
-        ]
-    }
+    mock_load_audio.return_value = np.zeros(16000, dtype=np.float32)
+
+    # Stub the whisper model, recording the transcribe calls
+    _get_model.cache_clear()
+    calls = []
+
+    def transcribe(*args, **kwargs):
+        calls.append((args, kwargs))
+        return (
+            iter([
+                SimpleNamespace(start=0.0, end=1.0, text=" Hello"),
+                SimpleNamespace(start=1.0, end=2.0, text=" world")
+            ]),
+            SimpleNamespace(language="en")
+        )
+
+    mock_whisper_model.return_value = SimpleNamespace(transcribe=transcribe)
 
     # Call the function
-    transcript = transcribe_video("test_video.mp4")
+    transcript = transcribe_video("test_video.mp4", language="en")
+    _get_model.cache_clear()
 
     # Verify
-    assert mock_extract_audio.called
-    assert mock_whisper.load_model.called
-    assert mock_model.transcribe.called
+    assert mock_load_audio.called
+    mock_whisper_model.assert_called_once_with("base", device="auto", compute_type="int8")
+    assert calls == [((mock_load_audio.return_value,), {"beam_size": 1, "language": "en"})]
 
     assert transcript.language == "en"
     assert len(transcript.segments) == 2
-    assert transcript.full_text == "Hello world"
\ No newline at end of file
+    assert transcript.full_text == FULL_TEXT
+
+
+@mock.patch("faster_whisper.WhisperModel")
+def test_get_model_is_cached(mock_whisper_model):
+    _get_model.cache_clear()
+
+    first = _get_model("tiny")
+    second = _get_model("tiny")
+
+    # The model is only loaded once per name
+    assert first is second
+    mock_whisper_model.assert_called_once_with("tiny", device="auto", compute_type="int8")
+    _get_model.cache_clear()
+
+
+def test_heavy_dependencies_are_imported_lazily():
+    # Loading a saved transcript must not pay for importing faster-whisper
+    code = "import sys, shorts_whisperer.cli; print('faster_whisper' in sys.modules, 'ollama' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], stdout=subprocess.PIPE, check=True, text=True)
+    assert result.stdout.strip() == "False False"